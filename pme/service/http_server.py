@@ -0,0 +1,152 @@
+# coding=utf-8
+import argparse
+import json
+import threading
+import BaseHTTPServer
+import SocketServer
+
+from pme.service.pme_service import PmeService, ServiceBusyError, ServiceTimeoutError
+
+
+class ThreadingHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """
+    Threaded HTTP server with a cap on concurrent handler threads. Once the cap is reached the accept loop blocks, so
+    further connections wait in the listen backlog instead of each getting a thread.
+    """
+    daemon_threads = True
+
+    def __init__(self, server_address, handler_class, max_handler_threads=64):
+        BaseHTTPServer.HTTPServer.__init__(self, server_address, handler_class)
+        self.handler_slots = threading.BoundedSemaphore(max_handler_threads)
+
+    def process_request(self, request, client_address):
+        self.handler_slots.acquire()
+        try:
+            SocketServer.ThreadingMixIn.process_request(self, request, client_address)
+        except Exception:
+            self.handler_slots.release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            SocketServer.ThreadingMixIn.process_request_thread(self, request, client_address)
+        finally:
+            self.handler_slots.release()
+
+
+class PmeRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    JSON front end for PmeService. Each request is a POST to /<method_name> (e.g. /kaplan_schoar_pme) whose body is a
+    JSON object of keyword arguments for that method. An optional "timeout" key (seconds) overrides the service's
+    default per-request timeout.
+
+    Responds with 200 and the JSON result, 400 for bad requests, 413 when the body exceeds max_content_length, 503
+    when the service is busy, and 504 on timeout.
+    """
+    service = None
+    max_content_length = 16 * 1024 * 1024
+    # Socket timeout (seconds) for reading the request, so a client that stalls mid-body releases its handler slot
+    timeout = 10
+
+    def do_POST(self):
+        method_name = self.path.strip("/")
+
+        try:
+            content_length = int(self.headers.getheader("Content-Length") or 0)
+        except ValueError:
+            return self._send_json(400, {"error": "Invalid Content-Length."})
+
+        if content_length < 0:
+            return self._send_json(400, {"error": "Invalid Content-Length."})
+
+        if content_length > self.max_content_length:
+            return self._send_json(413, {"error": "Request body exceeds %d bytes." % self.max_content_length})
+
+        body = self.rfile.read(content_length) or "{}"
+        request_key = self.service.make_request_key(body)
+
+        try:
+            # An identical request already in flight adds no work, so join it without parsing the body. Otherwise shed
+            # load before parsing when the queue is full. Identical bodies carry identical timeouts, so a joined
+            # request uses the timeout its calculation was submitted with.
+            pending = self.service.join(method_name, request_key)
+            if pending is None:
+                if self.service.is_full():
+                    return self._send_json(503, {"error": "Request queue is full."})
+
+                try:
+                    kwargs = json.loads(body)
+                except ValueError as e:
+                    return self._send_json(400, {"error": "Invalid request body: %s" % e})
+
+                if not isinstance(kwargs, dict):
+                    return self._send_json(400, {"error": "Request body must be a JSON object."})
+
+                timeout = kwargs.pop("timeout", None)
+                pending = self.service.submit(method_name, timeout=timeout, request_key=request_key, **kwargs)
+
+            payload = pending.wait_json(pending.timeout)
+        except ServiceBusyError as e:
+            return self._send_json(503, {"error": str(e)})
+        except ServiceTimeoutError as e:
+            return self._send_json(504, {"error": str(e)})
+        except (ValueError, TypeError) as e:
+            return self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            return self._send_json(500, {"error": str(e)})
+
+        self._send_payload(200, payload)
+
+    def log_message(self, format, *args):
+        # Keep load tests quiet; errors are reported in the response body
+        pass
+
+    def _send_json(self, status, body):
+        self._send_payload(status, json.dumps(body, default=str))
+
+    def _send_payload(self, status, payload):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def make_server(host="127.0.0.1", port=8080, service=None, max_handler_threads=64, max_content_length=None):
+    """
+    Build (but don't start) a threaded HTTP server that dispatches to the given PmeService.
+    :param host: interface to bind
+    :param port: port to bind; 0 picks a free port
+    :param service: PmeService instance; a default one is created if None
+    :param max_handler_threads: maximum number of requests handled concurrently
+    :param max_content_length: maximum request body size in bytes; defaults to PmeRequestHandler.max_content_length
+    :return: ThreadingHTTPServer
+    """
+    class BoundPmeRequestHandler(PmeRequestHandler):
+        pass
+
+    BoundPmeRequestHandler.service = service or PmeService()
+    if max_content_length is not None:
+        BoundPmeRequestHandler.max_content_length = max_content_length
+
+    return ThreadingHTTPServer((host, port), BoundPmeRequestHandler, max_handler_threads=max_handler_threads)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve PME calculations over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--max-handler-threads", type=int, default=64)
+    parser.add_argument("--max-content-length", type=int, default=None)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, PmeService(
+        max_workers=args.workers,
+        max_queue_size=args.queue_size,
+        timeout=args.timeout
+    ), max_handler_threads=args.max_handler_threads, max_content_length=args.max_content_length)
+    print "Serving PME calculations on http://%s:%d" % (args.host, args.port)
+    server.serve_forever()
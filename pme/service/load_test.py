@@ -0,0 +1,120 @@
+# coding=utf-8
+import argparse
+import datetime
+import json
+import random
+import threading
+import time
+import urllib2
+
+from common.model_enums import TransactionTypeEnum
+
+
+def build_request_body(num_returns, seed):
+    """
+    Build a synthetic Kaplan-Schoar request: a random-walk benchmark with a contribution at the start and a
+    distribution at the end. Requests built with the same seed are identical and should be coalesced by the service.
+    :param num_returns: number of benchmark returns
+    :param seed: random seed
+    :return: dict of keyword arguments for calculate_kaplan_schoar_PME
+    """
+    rand = random.Random(seed)
+    start_date = datetime.datetime(2000, 1, 1)
+
+    benchmark_returns = []
+    for i in xrange(num_returns):
+        benchmark_returns.append({
+            "date": datetime.datetime.strftime(start_date + datetime.timedelta(days=i), "%Y-%m-%d"),
+            "timeWeightedReturn": rand.gauss(0.0003, 0.01) if i > 0 else 0.0
+        })
+
+    investment_transactions = [{
+        "date": benchmark_returns[0]["date"],
+        "value": -1000.0,
+        "transactionTypeId": TransactionTypeEnum.Contribution
+    }, {
+        "date": benchmark_returns[-1]["date"],
+        "value": 1500.0,
+        "transactionTypeId": TransactionTypeEnum.Distribution
+    }]
+
+    return {
+        "benchmark_returns": benchmark_returns,
+        "investment_transactions": investment_transactions,
+        "calculate_tvpi": True
+    }
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load_test(url, num_requests, concurrency, num_returns, distinct_bodies):
+    """
+    Fire num_requests POSTs at url from `concurrency` threads and collect latencies by status code. Latencies are
+    kept per status so that fast rejections (503/504) don't flatter the latency of successful requests.
+    :return: dict of status code -> sorted list of latencies in seconds
+    """
+    bodies = [json.dumps(build_request_body(num_returns, seed)) for seed in xrange(distinct_bodies)]
+    latencies_by_status = {}
+    lock = threading.Lock()
+    counter = iter(xrange(num_requests))
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+
+            request = urllib2.Request(url, bodies[i % distinct_bodies], {"Content-Type": "application/json"})
+            start = time.time()
+            try:
+                response = urllib2.urlopen(request)
+                response.read()
+                status = response.getcode()
+            except urllib2.HTTPError as e:
+                e.read()
+                status = e.code
+            except urllib2.URLError:
+                status = "connection error"
+            elapsed = time.time() - start
+
+            with lock:
+                latencies_by_status.setdefault(status, []).append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in xrange(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for latencies in latencies_by_status.values():
+        latencies.sort()
+
+    return latencies_by_status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure p50/p99 latency of a local PME service instance.")
+    parser.add_argument("--url", default="http://127.0.0.1:8080/kaplan_schoar_pme")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--returns", type=int, default=2000, help="benchmark returns per request")
+    parser.add_argument("--distinct", type=int, default=5, help="number of distinct request bodies (lower = more coalescing)")
+    args = parser.parse_args()
+
+    started = time.time()
+    latencies_by_status = run_load_test(args.url, args.requests, args.concurrency, args.returns, args.distinct)
+    total = time.time() - started
+
+    num_completed = sum(len(x) for x in latencies_by_status.values())
+    num_succeeded = len(latencies_by_status.get(200, []))
+    print "requests: %d in %.2fs (%.1f req/s, %.1f successful req/s)" % (num_completed, total, num_completed / total, num_succeeded / total)
+    for (status, latencies) in sorted(latencies_by_status.items()):
+        print "%s: count=%d p50=%.1f ms p99=%.1f ms" % (status, len(latencies), percentile(latencies, 50) * 1000, percentile(latencies, 99) * 1000)
+    if not num_succeeded:
+        print "200: no successful requests, so no p50/p99"
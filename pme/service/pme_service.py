@@ -0,0 +1,262 @@
+# coding=utf-8
+import hashlib
+import json
+import multiprocessing
+# datetime.strptime lazily imports _strptime on first use, which is not thread-safe in Python 2 and can fail with
+# "'module' object has no attribute '_strptime'". Import it here so the forked pool processes start with it loaded,
+# as do any threads in this process that call the PME code directly.
+import _strptime  # noqa: F401
+import threading
+import time
+import Queue
+
+from common.utils.xirr_utils import XirrsUtils
+from pme.utils.pme_utils import PmeUtils
+
+
+class ServiceBusyError(Exception):
+    """
+    Raised when the service's request queue is full and a new computation cannot be accepted.
+    """
+    pass
+
+
+class ServiceTimeoutError(Exception):
+    """
+    Raised when a computation does not finish within the request's timeout.
+    """
+    pass
+
+
+# Maps each service method name to the (utils attribute, method name) it runs in the worker processes
+_METHODS = {
+    "kaplan_schoar_pme": ("pme_utils", "calculate_kaplan_schoar_PME"),
+    "long_nickels_pme": ("pme_utils", "calculate_long_nickels_PME"),
+    "mpme": ("pme_utils", "calculate_mPME"),
+    "xirrs_timeseries": ("xirrs_utils", "read_xirrs_timeseries"),
+}
+
+# Per-process utils instances, set once by _init_worker_process so they aren't pickled with every task
+_worker_utils = {}
+
+
+def _init_worker_process(pme_utils, xirrs_utils):
+    _worker_utils["pme_utils"] = pme_utils
+    _worker_utils["xirrs_utils"] = xirrs_utils
+
+
+def _run_calculation(method_name, kwargs):
+    (utils_name, utils_method_name) = _METHODS[method_name]
+    return getattr(_worker_utils[utils_name], utils_method_name)(**kwargs)
+
+
+class _PendingCalculation(object):
+    """
+    A single queued computation, shared by every caller that submitted an identical request while it was in flight.
+    """
+    def __init__(self, key, method_name, kwargs, timeout):
+        self.key = key
+        self.method_name = method_name
+        self.kwargs = kwargs
+        self.timeout = timeout
+        self.deadline = time.time() + timeout
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self._result_json = None
+        self._result_json_lock = threading.Lock()
+
+    def wait(self, timeout):
+        """
+        Wait for the calculation to finish.
+        :param timeout: seconds to wait
+        :return: the result. It is shared by every coalesced caller, so treat it as read-only.
+        """
+        self.done.wait(timeout)
+        if not self.done.is_set():
+            raise ServiceTimeoutError("Timed out waiting for %s calculation." % self.method_name)
+
+        if self.error is not None:
+            raise self.error
+
+        return self.result
+
+    def wait_json(self, timeout):
+        """
+        Like wait(), but return the result as a JSON object string of the form { result }, serialized once and
+        shared by every coalesced caller.
+        """
+        result = self.wait(timeout)
+        with self._result_json_lock:
+            if self._result_json is None:
+                self._result_json = json.dumps({"result": result}, default=str)
+
+        return self._result_json
+
+
+class PmeService(object):
+    """
+    Process-pooled service layer around PmeUtils and XirrsUtils.
+
+    Computations are fed from a bounded queue to a multiprocessing.Pool, so the pure-Python PME/XIRR loops run in
+    parallel across cores instead of contending for the GIL. One dispatcher thread per worker process hands work to the
+    pool and waits for its result.
+
+    Identical requests (same method and same arguments) that arrive while a computation is queued or running are
+    coalesced onto that computation instead of redoing it. When the queue is full new requests are rejected with
+    ServiceBusyError, and each caller waits at most `timeout` seconds before getting a ServiceTimeoutError.
+    """
+    pme_utils = None
+    xirrs_utils = None
+
+    # Seconds past a calculation's deadline to keep waiting on the pool before giving up on it. A pool worker that
+    # dies mid-task (e.g. OOM-killed) never returns a result, so without this the dispatcher would wait forever.
+    result_grace_period = 5.0
+
+    def __init__(self, pme_utils=None, xirrs_utils=None, max_workers=4, max_queue_size=64, timeout=30.0):
+        self.pme_utils = pme_utils or PmeUtils()
+        self.xirrs_utils = xirrs_utils or XirrsUtils()
+        self.timeout = timeout
+
+        self.methods = sorted(_METHODS.keys())
+
+        # Create the pool before starting any threads so the worker processes are forked from a single-threaded parent
+        self._pool = multiprocessing.Pool(
+            processes=max_workers,
+            initializer=_init_worker_process,
+            initargs=(self.pme_utils, self.xirrs_utils)
+        )
+        self._queue = Queue.Queue(maxsize=max_queue_size)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._workers = []
+        for i in xrange(max_workers):
+            worker = threading.Thread(target=self._run_dispatcher, name="pme-service-dispatcher-%d" % i)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def calculate(self, method_name, timeout=None, **kwargs):
+        """
+        Run one of the supported calculations and block until its result is available.
+        :param method_name: one of self.methods (e.g. "kaplan_schoar_pme")
+        :param timeout: seconds to wait for the result; defaults to the service's timeout
+        :param kwargs: keyword arguments for the underlying PmeUtils/XirrsUtils method
+        :return: the result of the underlying method, shared with any coalesced callers (treat it as read-only)
+        """
+        timeout = timeout if timeout is not None else self.timeout
+        pending = self.submit(method_name, timeout=timeout, **kwargs)
+        return pending.wait(timeout)
+
+    def submit(self, method_name, timeout=None, request_key=None, **kwargs):
+        """
+        Queue a calculation, or join an identical one that is already in flight.
+        :param method_name: one of self.methods
+        :param timeout: seconds after which a not-yet-started calculation is abandoned
+        :param request_key: string identifying the request's arguments for coalescing, e.g. a digest of the raw request
+            body. If None, one is built by serializing kwargs, which is slow for large inputs.
+        :param kwargs: keyword arguments for the underlying method
+        :return: _PendingCalculation whose wait() returns the result
+        """
+        # Catch invalid state(s)
+        if method_name not in self.methods:
+            raise ValueError("Unknown calculation: %s" % method_name)
+
+        timeout = timeout if timeout is not None else self.timeout
+        if request_key is None:
+            request_key = self.make_request_key(json.dumps(kwargs, sort_keys=True, default=str))
+        key = (method_name, request_key)
+
+        with self._lock:
+            pending = self._join_in_flight(key, timeout)
+            if pending is not None:
+                return pending
+
+            pending = _PendingCalculation(key, method_name, kwargs, timeout)
+            try:
+                self._queue.put_nowait(pending)
+            except Queue.Full:
+                raise ServiceBusyError("Request queue is full (%d pending)." % self._queue.maxsize)
+
+            self._in_flight[key] = pending
+
+        return pending
+
+    def join(self, method_name, request_key, timeout=None):
+        """
+        Join an identical calculation that is already in flight, without needing the request's arguments. Lets front
+        ends skip parsing (and load shedding) for requests that would add no work.
+        :param method_name: one of self.methods
+        :param request_key: request_key the calculation was submitted with
+        :param timeout: seconds this caller will wait; defaults to the timeout the calculation was submitted with
+        :return: _PendingCalculation, or None if no identical calculation is in flight
+        """
+        with self._lock:
+            return self._join_in_flight((method_name, request_key), timeout)
+
+    def make_request_key(self, raw_request):
+        """
+        :param raw_request: serialized request arguments
+        :return: request_key for submit()
+        """
+        return hashlib.sha1(raw_request).hexdigest()
+
+    def is_full(self):
+        """
+        Cheap check that lets front ends shed load before parsing a request.
+        :return: True if no new (non-coalesced) calculation can currently be queued
+        """
+        return self._queue.full()
+
+    def close(self):
+        """
+        Stop the worker processes. The service can't be used afterwards.
+        """
+        self._pool.terminate()
+        self._pool.join()
+
+    def _join_in_flight(self, key, timeout):
+        # Must be called with self._lock held
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            # Extend the deadline so the newest caller isn't abandoned by an older caller's timeout
+            timeout = timeout if timeout is not None else pending.timeout
+            pending.deadline = max(pending.deadline, time.time() + timeout)
+
+        return pending
+
+    def _run_dispatcher(self):
+        while True:
+            pending = self._queue.get()
+            try:
+                if time.time() > pending.deadline:
+                    # Every caller has already given up on this one, so skip the work
+                    pending.error = ServiceTimeoutError("Calculation expired before it was started.")
+                else:
+                    # Arguments are pickled to the worker process, so the caller's objects are never mutated
+                    async_result = self._pool.apply_async(_run_calculation, (pending.method_name, pending.kwargs))
+                    pending.result = self._wait_for_result(pending, async_result)
+            except Exception as e:
+                pending.error = e
+            finally:
+                with self._lock:
+                    self._in_flight.pop(pending.key, None)
+                pending.done.set()
+                self._queue.task_done()
+
+    def _wait_for_result(self, pending, async_result):
+        """
+        Wait for a pool result until the pending calculation's deadline (which coalesced callers may extend) plus
+        result_grace_period has passed.
+        :return: the calculation's result
+        """
+        while True:
+            remaining = pending.deadline + self.result_grace_period - time.time()
+            if remaining <= 0:
+                raise ServiceTimeoutError("Timed out waiting for %s calculation." % pending.method_name)
+
+            try:
+                return async_result.get(remaining)
+            except multiprocessing.TimeoutError:
+                # Loop to re-check the deadline, which may have been extended while we waited
+                pass
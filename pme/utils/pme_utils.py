@@ -53,49 +53,30 @@ class PmeUtils(object):
             "value": x["value"]
         } for x in self.transaction_utils.aggregate_transactions_by_date(investment_transactions, transaction_type_id=TransactionTypeEnum.Distribution)]
 
-        prev_value = None
-        cumulative_contributions = 0.0
-        cumulative_distributions = 0.0
+        state = {
+            "prev_value": None,
+            "cumulative_contributions": 0.0,
+            "cumulative_distributions": 0.0
+        }
         theoretical_investment_series = []
         for benchmark_return in benchmark_returns:
-            theoretical_investment_series_item = {
-                "date": benchmark_return["date"],
-                "balance": None
-            }
-
             current_date = datetime.datetime.strptime(benchmark_return["date"], "%Y-%m-%d")
 
-            current_value = 0.0
-            if prev_value:
-                current_value = prev_value * (1 + benchmark_return["timeWeightedReturn"])
-
-            # If there are contributions or distributions on the current date, add their values to current_value and
-            # add to cumulative_contributions and/or cumulative_distributions.
             contribution = self.bisect_helpers.find_eq_by_key(contributions_aggregated_by_date, current_date, "date")
             distribution = self.bisect_helpers.find_eq_by_key(distributions_aggregated_by_date, current_date, "date")
 
-            if contribution is not None:
-                current_value += contribution["value"]
-                cumulative_contributions += contribution["value"]
-
-            if distribution is not None:
-                current_value += distribution["value"]
-                cumulative_distributions += distribution["value"]
+            current_value = self.__long_nickels_step(
+                state,
+                benchmark_return,
+                contribution["value"] if contribution is not None else None,
+                distribution["value"] if distribution is not None else None,
+                calculate_tvpi
+            )
 
-            theoretical_investment_series_item["balance"] = current_value
-            theoretical_investment_series.append(theoretical_investment_series_item)
-
-            # calculate dpi, rvpi, and tvpi
-            if calculate_tvpi and cumulative_contributions:
-                benchmark_return["dpi"] = -1 * cumulative_distributions / cumulative_contributions
-                benchmark_return["rvpi"] = current_value / cumulative_contributions
-                benchmark_return["tvpi"] = benchmark_return["dpi"] + benchmark_return["rvpi"]
-            elif calculate_tvpi:
-                benchmark_return["dpi"] = 0.0
-                benchmark_return["rvpi"] = 0.0
-                benchmark_return["tvpi"] = benchmark_return["dpi"] + benchmark_return["rvpi"]
-
-            prev_value = current_value
+            theoretical_investment_series.append({
+                "date": benchmark_return["date"],
+                "balance": current_value
+            })
 
         # calculate PME (xirr)
         if calculate_xirr:
@@ -141,23 +122,15 @@ class PmeUtils(object):
         sorted_investment_returns = sorted(datetime_investment_returns, key=lambda x: x["date"])
 
         # For each benchmark return, compute a theoretical balance report and a weighted distribution value
-        prev_theoretical_balance = None
-        prev_benchmark_balance = None
-        cumulative_contributions = 0.0
-        cumulative_weighted_distributions = 0.0
+        state = {
+            "prev_theoretical_balance": 0.0,
+            "prev_benchmark_balance": None,
+            "cumulative_contributions": 0.0,
+            "cumulative_weighted_distributions": 0.0
+        }
         theoretical_balances = []
         weighted_distributions = []
         for benchmark_return in benchmark_returns:
-            theoretical_balances_item = {
-                "date": benchmark_return["date"],
-                "balance": None
-            }
-
-            weighted_distributions_item = {
-                "date": benchmark_return["date"],
-                "value": None
-            }
-
             current_date = datetime.datetime.strptime(benchmark_return["date"], "%Y-%m-%d")
 
             # get contribution, distribution, and most recent return for this date
@@ -165,48 +138,24 @@ class PmeUtils(object):
             distribution = self.bisect_helpers.find_eq_by_key(distributions_aggregated_by_date, current_date, "date")
             most_recent_return = self.bisect_helpers.find_le_by_key(sorted_investment_returns, current_date, "date")
 
-            # Calculate Distribution Weight
-            distribution_weight = 0.0
-            if distribution is not None and most_recent_return is not None:
-                distribution_weight = -distribution["value"] / (-distribution["value"] + most_recent_return["balance"])
-
-            # Compute theoretical balance report and weighted distribution, using:
-            # - Previous theoretical balance
-            # - Previous benchmark balance and balance at date of pme measurement
-            # - Contributions on that date
-            # - Distribution weight
-            # adjusted_balance is equivalent to the value of the theoretical investment without the removal of the distributions
-            prev_theoretical_balance = prev_theoretical_balance if prev_theoretical_balance is not None else 0.0
-            prev_benchmark_balance = prev_benchmark_balance if prev_benchmark_balance is not None else benchmark_return["balance"]
-
-            adjusted_balance = prev_theoretical_balance * (benchmark_return["balance"] / prev_benchmark_balance) + \
-                (contribution["value"] if contribution is not None else 0.0)
-
-            theoretical_balance = (1 - distribution_weight) * adjusted_balance
-            weighted_distribution = -1 * distribution_weight * adjusted_balance
-
-            theoretical_balances_item["balance"] = theoretical_balance
-            theoretical_balances.append(theoretical_balances_item)
-
-            weighted_distributions_item["value"] = weighted_distribution
-            weighted_distributions.append(weighted_distributions_item)
-
-            # calculate dpi, rvpi, and tvpi
-            cumulative_contributions += contribution["value"] if contribution is not None else 0.0
-            cumulative_weighted_distributions += weighted_distribution
-
-            if calculate_tvpi and cumulative_contributions:
-                benchmark_return["dpi"] = -1 * cumulative_weighted_distributions / cumulative_contributions
-                benchmark_return["rvpi"] = theoretical_balance / cumulative_contributions
-                benchmark_return["tvpi"] = benchmark_return["dpi"] + benchmark_return["rvpi"]
-            elif calculate_tvpi:
-                benchmark_return["dpi"] = 0.0
-                benchmark_return["rvpi"] = 0.0
-                benchmark_return["tvpi"] = benchmark_return["dpi"] + benchmark_return["rvpi"]
-
-            # Set "previous values" for next iteration of loop
-            prev_theoretical_balance = theoretical_balance
-            prev_benchmark_balance = benchmark_return["balance"]
+            (theoretical_balance, weighted_distribution) = self.__mPME_step(
+                state,
+                benchmark_return,
+                contribution["value"] if contribution is not None else None,
+                distribution["value"] if distribution is not None else None,
+                most_recent_return,
+                calculate_tvpi
+            )
+
+            theoretical_balances.append({
+                "date": benchmark_return["date"],
+                "balance": theoretical_balance
+            })
+
+            weighted_distributions.append({
+                "date": benchmark_return["date"],
+                "value": weighted_distribution
+            })
 
         # Run xirr calculation using Theoretical Balances as "returns" and Contributions list + Weighted Distributions list as transactions
         if calculate_xirr:
@@ -249,52 +198,370 @@ class PmeUtils(object):
             "value": x["value"]
         } for x in self.transaction_utils.aggregate_transactions_by_date(investment_transactions, transaction_type_id=TransactionTypeEnum.Contribution)]
 
-        cumulative_contributions = 0.0
-        prev_discounted_distribution_value = None
-        prev_discounted_contribution_value = None
+        state = {
+            "prev_discounted_distribution_value": None,
+            "prev_discounted_contribution_value": None,
+            "cumulative_contributions": 0.0
+        }
         for benchmark_return in benchmark_returns:
             current_date = datetime.datetime.strptime(benchmark_return["date"], "%Y-%m-%d")
 
-            # Determine total discounted distribution value
-            total_discounted_distribution_value = 0.0
-            if prev_discounted_distribution_value is not None:
-                total_discounted_distribution_value = prev_discounted_distribution_value * (1 + benchmark_return["timeWeightedReturn"])
-
+            contribution = self.bisect_helpers.find_eq_by_key(contributions_aggregated_by_date, current_date, "date")
             distribution = self.bisect_helpers.find_eq_by_key(distributions_aggregated_by_date, current_date, "date")
-            if distribution is not None:
-                total_discounted_distribution_value += distribution["value"]
 
-            # Determine total discounted contribution value
-            total_discounted_contribution_value = 0.0
-            if prev_discounted_contribution_value is not None:
-                total_discounted_contribution_value = prev_discounted_contribution_value * (1 + benchmark_return["timeWeightedReturn"])
+            self.__kaplan_schoar_step(
+                state,
+                benchmark_return,
+                contribution["value"] if contribution is not None else None,
+                distribution["value"] if distribution is not None else None,
+                calculate_tvpi
+            )
 
-            contribution = self.bisect_helpers.find_eq_by_key(contributions_aggregated_by_date, current_date, "date")
-            if contribution is not None:
-                total_discounted_contribution_value += contribution["value"]
-                cumulative_contributions += contribution["value"]
+        return benchmark_returns
 
-            # Calculate pme
-            if total_discounted_contribution_value != 0:
-                benchmark_return["kaplanSchoarMultiple"] = total_discounted_distribution_value / (-1 * total_discounted_contribution_value)
-            else:
-                benchmark_return["kaplanSchoarMultiple"] = 0
-
-            # Calculate dpi, rvpi, and tvpi
-            if calculate_tvpi and cumulative_contributions:
-                benchmark_return["dpi"] = -1 * total_discounted_distribution_value / cumulative_contributions
-                benchmark_return["rvpi"] = (total_discounted_contribution_value + total_discounted_distribution_value) / cumulative_contributions
-                benchmark_return["tvpi"] = benchmark_return["dpi"] + benchmark_return["rvpi"]
-            elif calculate_tvpi:
-                benchmark_return["dpi"] = 0.0
-                benchmark_return["rvpi"] = 0.0
-                benchmark_return["tvpi"] = benchmark_return["dpi"] + benchmark_return["rvpi"]
-
-            # Set "previous values" for next iteration
-            prev_discounted_distribution_value = total_discounted_distribution_value
-            prev_discounted_contribution_value = total_discounted_contribution_value
+    def stream_long_nickels_PME(self, benchmark_returns, investment_transactions, checkpoint_dates=None, calculate_tvpi=False):
+        """
+        Streaming version of calculate_long_nickels_PME. Benchmark returns and transactions are consumed lazily and
+        merge-joined on date, and one result row is yielded per benchmark return, so memory use does not grow with the
+        length of the benchmark series.
+
+        XIRR is only calculated on the rows whose dates appear in checkpoint_dates; all other rows get "xirr": None.
+        Checkpoint dates with no benchmark return on that date are ignored.
+        The XIRR at a checkpoint is that of the investment's cash flows up to and including the checkpoint date, with
+        the theoretical investment value on that date as the final balance.
+        :param benchmark_returns: iterable of benchmark returns of at least the form { date, timeWeightedReturn },
+            ordered by date
+        :param investment_transactions: iterable of transactions of the form { date, value, transactionTypeId },
+            ordered by date. Every transaction date must have a matching benchmark return.
+        :param checkpoint_dates: iterable of dates ("%Y-%m-%d"), ordered by date, on which to calculate XIRR
+        :return: generator of benchmark return rows with xirr (and optionally dpi, rvpi, tvpi) filled in
+        """
+        checkpoints = self.__iterate_checkpoints(checkpoint_dates)
+        state = {
+            "prev_value": None,
+            "cumulative_contributions": 0.0,
+            "cumulative_distributions": 0.0
+        }
+        cash_flows = []
+        for (benchmark_return, contribution, distribution) in self.__merge_transactions_by_date(benchmark_returns, investment_transactions):
+            row = {}
+            row.update(benchmark_return)
 
-        return benchmark_returns
+            current_value = self.__long_nickels_step(state, row, contribution, distribution, calculate_tvpi)
+
+            # Only cash flows are kept for the XIRR, so memory grows with the number of transactions, not returns
+            if contribution is not None or distribution is not None:
+                cash_flows.append({
+                    "date": datetime.datetime.strptime(row["date"], "%Y-%m-%d"),
+                    "value": -1 * ((contribution or 0.0) + (distribution or 0.0))
+                })
+
+            row["xirr"] = self.__calculate_checkpoint_xirr(checkpoints, row["date"], cash_flows, current_value)
+
+            yield row
+
+    def stream_mPME(self, benchmark_returns, investment_returns, investment_transactions, checkpoint_dates=None, calculate_tvpi=False):
+        """
+        Streaming version of calculate_mPME. Benchmark returns, investment returns and transactions are consumed
+        lazily and merge-joined on date, and one result row is yielded per benchmark return.
+
+        XIRR is only calculated on the rows whose dates appear in checkpoint_dates; all other rows get "xirr": None.
+        Checkpoint dates with no benchmark return on that date are ignored.
+        The XIRR at a checkpoint is that of the contributions and weighted distributions up to and including the
+        checkpoint date, with the theoretical balance on that date as the final balance.
+        :param benchmark_returns: iterable of benchmark returns of at least the form { date, balance }, ordered by date
+        :param investment_returns: iterable of the primary investment's returns { date, balance }, ordered by date
+        :param investment_transactions: iterable of transactions of the form { date, value, transactionTypeId },
+            ordered by date. Every transaction date must have a matching benchmark return.
+        :param checkpoint_dates: iterable of dates ("%Y-%m-%d"), ordered by date, on which to calculate XIRR
+        :return: generator of benchmark return rows with xirr (and optionally dpi, rvpi, tvpi) filled in
+        """
+        checkpoints = self.__iterate_checkpoints(checkpoint_dates)
+        investment_returns = iter(investment_returns)
+        next_investment_return = next(investment_returns, None)
+        most_recent_return = None
+
+        state = {
+            "prev_theoretical_balance": 0.0,
+            "prev_benchmark_balance": None,
+            "cumulative_contributions": 0.0,
+            "cumulative_weighted_distributions": 0.0
+        }
+        cash_flows = []
+        for (benchmark_return, contribution, distribution) in self.__merge_transactions_by_date(benchmark_returns, investment_transactions):
+            row = {}
+            row.update(benchmark_return)
+
+            # Advance to the most recent investment return on or before this date
+            while next_investment_return is not None and next_investment_return["date"] <= row["date"]:
+                # Catch invalid state(s)
+                if most_recent_return is not None and next_investment_return["date"] < most_recent_return["date"]:
+                    raise Exception("Invalid state: investment returns must be ordered by date.")
+
+                most_recent_return = next_investment_return
+                next_investment_return = next(investment_returns, None)
+
+            (theoretical_balance, weighted_distribution) = self.__mPME_step(
+                state, row, contribution, distribution, most_recent_return, calculate_tvpi
+            )
+
+            if contribution is not None or distribution is not None:
+                cash_flows.append({
+                    "date": datetime.datetime.strptime(row["date"], "%Y-%m-%d"),
+                    "value": -1 * ((contribution or 0.0) + weighted_distribution)
+                })
+
+            row["xirr"] = self.__calculate_checkpoint_xirr(checkpoints, row["date"], cash_flows, theoretical_balance)
+
+            yield row
+
+    def stream_kaplan_schoar_PME(self, benchmark_returns, investment_transactions, calculate_tvpi=False):
+        """
+        Streaming version of calculate_kaplan_schoar_PME. Benchmark returns and transactions are consumed lazily and
+        merge-joined on date, and one result row is yielded per benchmark return.
+        :param benchmark_returns: iterable of benchmark returns of at least the form { date, timeWeightedReturn },
+            ordered by date
+        :param investment_transactions: iterable of transactions of the form { date, value, transactionTypeId },
+            ordered by date. Every transaction date must have a matching benchmark return.
+        :return: generator of benchmark return rows with kaplanSchoarMultiple (and optionally dpi, rvpi, tvpi) filled in
+        """
+        state = {
+            "prev_discounted_distribution_value": None,
+            "prev_discounted_contribution_value": None,
+            "cumulative_contributions": 0.0
+        }
+        for (benchmark_return, contribution, distribution) in self.__merge_transactions_by_date(benchmark_returns, investment_transactions):
+            row = {}
+            row.update(benchmark_return)
+
+            self.__kaplan_schoar_step(state, row, contribution, distribution, calculate_tvpi)
+
+            yield row
+
+    def __long_nickels_step(self, state, benchmark_return, contribution, distribution, calculate_tvpi):
+        """
+        Advance the Long-Nickels theoretical investment by one benchmark return.
+        :param state: running values { prev_value, cumulative_contributions, cumulative_distributions }, updated in place
+        :param benchmark_return: benchmark return for this date; dpi, rvpi and tvpi are set on it if calculate_tvpi
+        :param contribution: total contribution value on this date, or None
+        :param distribution: total distribution value on this date, or None
+        :param calculate_tvpi: whether to set dpi, rvpi and tvpi
+        :return: value of the theoretical investment on this date
+        """
+        current_value = 0.0
+        if state["prev_value"]:
+            current_value = state["prev_value"] * (1 + benchmark_return["timeWeightedReturn"])
+
+        # If there are contributions or distributions on the current date, add their values to current_value and
+        # add to cumulative_contributions and/or cumulative_distributions.
+        if contribution is not None:
+            current_value += contribution
+            state["cumulative_contributions"] += contribution
+
+        if distribution is not None:
+            current_value += distribution
+            state["cumulative_distributions"] += distribution
+
+        if calculate_tvpi:
+            self.__set_multiples(benchmark_return, state["cumulative_contributions"], state["cumulative_distributions"], current_value)
+
+        state["prev_value"] = current_value
+
+        return current_value
+
+    def __mPME_step(self, state, benchmark_return, contribution, distribution, most_recent_return, calculate_tvpi):
+        """
+        Advance the mPME theoretical investment by one benchmark return.
+        :param state: running values { prev_theoretical_balance, prev_benchmark_balance, cumulative_contributions,
+            cumulative_weighted_distributions }, updated in place
+        :param benchmark_return: benchmark return for this date; dpi, rvpi and tvpi are set on it if calculate_tvpi
+        :param contribution: total contribution value on this date, or None
+        :param distribution: total distribution value on this date, or None
+        :param most_recent_return: the primary investment's most recent return on or before this date, or None
+        :param calculate_tvpi: whether to set dpi, rvpi and tvpi
+        :return: (theoretical balance, weighted distribution) on this date
+        """
+        # Calculate Distribution Weight
+        distribution_weight = 0.0
+        if distribution is not None and most_recent_return is not None:
+            distribution_weight = -distribution / (-distribution + most_recent_return["balance"])
+
+        # Compute theoretical balance report and weighted distribution, using:
+        # - Previous theoretical balance
+        # - Previous benchmark balance and balance at date of pme measurement
+        # - Contributions on that date
+        # - Distribution weight
+        # adjusted_balance is equivalent to the value of the theoretical investment without the removal of the distributions
+        if state["prev_benchmark_balance"] is None:
+            state["prev_benchmark_balance"] = benchmark_return["balance"]
+
+        adjusted_balance = state["prev_theoretical_balance"] * (benchmark_return["balance"] / state["prev_benchmark_balance"]) + \
+            (contribution if contribution is not None else 0.0)
+
+        theoretical_balance = (1 - distribution_weight) * adjusted_balance
+        weighted_distribution = -1 * distribution_weight * adjusted_balance
+
+        # calculate dpi, rvpi, and tvpi
+        state["cumulative_contributions"] += contribution if contribution is not None else 0.0
+        state["cumulative_weighted_distributions"] += weighted_distribution
+
+        if calculate_tvpi:
+            self.__set_multiples(benchmark_return, state["cumulative_contributions"], state["cumulative_weighted_distributions"], theoretical_balance)
+
+        # Set "previous values" for next iteration of loop
+        state["prev_theoretical_balance"] = theoretical_balance
+        state["prev_benchmark_balance"] = benchmark_return["balance"]
+
+        return (theoretical_balance, weighted_distribution)
+
+    def __kaplan_schoar_step(self, state, benchmark_return, contribution, distribution, calculate_tvpi):
+        """
+        Roll the discounted contribution and distribution values forward by one benchmark return and set
+        kaplanSchoarMultiple on it.
+        :param state: running values { prev_discounted_distribution_value, prev_discounted_contribution_value,
+            cumulative_contributions }, updated in place
+        :param benchmark_return: benchmark return for this date; dpi, rvpi and tvpi are also set on it if calculate_tvpi
+        :param contribution: total contribution value on this date, or None
+        :param distribution: total distribution value on this date, or None
+        :param calculate_tvpi: whether to set dpi, rvpi and tvpi
+        """
+        # Determine total discounted distribution value
+        total_discounted_distribution_value = 0.0
+        if state["prev_discounted_distribution_value"] is not None:
+            total_discounted_distribution_value = state["prev_discounted_distribution_value"] * (1 + benchmark_return["timeWeightedReturn"])
+
+        if distribution is not None:
+            total_discounted_distribution_value += distribution
+
+        # Determine total discounted contribution value
+        total_discounted_contribution_value = 0.0
+        if state["prev_discounted_contribution_value"] is not None:
+            total_discounted_contribution_value = state["prev_discounted_contribution_value"] * (1 + benchmark_return["timeWeightedReturn"])
+
+        if contribution is not None:
+            total_discounted_contribution_value += contribution
+            state["cumulative_contributions"] += contribution
+
+        # Calculate pme
+        if total_discounted_contribution_value != 0:
+            benchmark_return["kaplanSchoarMultiple"] = total_discounted_distribution_value / (-1 * total_discounted_contribution_value)
+        else:
+            benchmark_return["kaplanSchoarMultiple"] = 0
+
+        if calculate_tvpi:
+            self.__set_multiples(
+                benchmark_return,
+                state["cumulative_contributions"],
+                total_discounted_distribution_value,
+                total_discounted_contribution_value + total_discounted_distribution_value
+            )
+
+        # Set "previous values" for next iteration
+        state["prev_discounted_distribution_value"] = total_discounted_distribution_value
+        state["prev_discounted_contribution_value"] = total_discounted_contribution_value
+
+    def __set_multiples(self, benchmark_return, cumulative_contributions, distributed_value, residual_value):
+        """
+        Calculate dpi, rvpi, and tvpi and set them on the benchmark return. All three are 0.0 until there has been a
+        contribution.
+        :param benchmark_return: benchmark return to update
+        :param cumulative_contributions: total contributions to date
+        :param distributed_value: (signed) value distributed to date
+        :param residual_value: value remaining in the investment
+        """
+        if cumulative_contributions:
+            benchmark_return["dpi"] = -1 * distributed_value / cumulative_contributions
+            benchmark_return["rvpi"] = residual_value / cumulative_contributions
+        else:
+            benchmark_return["dpi"] = 0.0
+            benchmark_return["rvpi"] = 0.0
+
+        benchmark_return["tvpi"] = benchmark_return["dpi"] + benchmark_return["rvpi"]
+
+    def __merge_transactions_by_date(self, benchmark_returns, investment_transactions):
+        """
+        Lazily merge-join date-ordered benchmark returns with date-ordered transactions. Dates are compared as
+        "%Y-%m-%d" strings, which sort chronologically.
+        :param benchmark_returns: iterable of benchmark returns with a "date", ordered by date
+        :param investment_transactions: iterable of transactions of the form { date, value, transactionTypeId },
+            ordered by date. Every transaction date must have a matching benchmark return.
+        :return: generator of (benchmark_return, total contribution or None, total distribution or None) tuples
+        """
+        investment_transactions = iter(investment_transactions)
+        next_transaction = next(investment_transactions, None)
+        prev_transaction_date = None
+        for benchmark_return in benchmark_returns:
+            current_date = benchmark_return["date"]
+
+            contribution = None
+            distribution = None
+            while next_transaction is not None and next_transaction["date"] <= current_date:
+                # Catch invalid state(s)
+                if prev_transaction_date is not None and next_transaction["date"] < prev_transaction_date:
+                    raise Exception("Invalid state: transactions must be ordered by date.")
+                if next_transaction["date"] < current_date:
+                    raise Exception("Invalid state: no benchmark return on transaction date %s." % next_transaction["date"])
+
+                if next_transaction["transactionTypeId"] == TransactionTypeEnum.Contribution:
+                    contribution = (contribution or 0.0) + (next_transaction["value"] or 0.0)
+                elif next_transaction["transactionTypeId"] == TransactionTypeEnum.Distribution:
+                    distribution = (distribution or 0.0) + (next_transaction["value"] or 0.0)
+
+                prev_transaction_date = next_transaction["date"]
+                next_transaction = next(investment_transactions, None)
+
+            yield (benchmark_return, contribution, distribution)
+
+        # Catch invalid state(s)
+        if next_transaction is not None:
+            raise Exception("Invalid state: no benchmark return on transaction date %s." % next_transaction["date"])
+
+    def __iterate_checkpoints(self, checkpoint_dates):
+        """
+        Wrap checkpoint dates in a one-item lookahead so they can be matched against a date-ordered stream.
+        :param checkpoint_dates: iterable of dates ("%Y-%m-%d") ordered by date, or None
+        :return: [iterator, next checkpoint date or None]
+        """
+        checkpoint_dates = iter(checkpoint_dates or [])
+        return [checkpoint_dates, next(checkpoint_dates, None)]
+
+    def __advance_checkpoint(self, checkpoints):
+        """
+        Move the lookahead from __iterate_checkpoints on to the following checkpoint date.
+        :param checkpoints: lookahead from __iterate_checkpoints, updated in place
+        """
+        (checkpoint_dates, current_checkpoint) = checkpoints
+        next_checkpoint = next(checkpoint_dates, None)
+
+        # Catch invalid state(s)
+        if next_checkpoint is not None and next_checkpoint < current_checkpoint:
+            raise Exception("Invalid state: checkpoint dates must be ordered by date.")
+
+        checkpoints[1] = next_checkpoint
+
+    def __calculate_checkpoint_xirr(self, checkpoints, current_date, cash_flows, balance):
+        """
+        Calculate the XIRR if current_date is the next checkpoint date, skipping any checkpoints already passed (those
+        had no benchmark return on their date).
+        :param checkpoints: lookahead from __iterate_checkpoints
+        :param current_date: date ("%Y-%m-%d") of the current row
+        :param cash_flows: sign-flipped cash flows { date, value } up to and including current_date
+        :param balance: value of the theoretical investment on current_date
+        :return: the XIRR, or None if current_date is not a checkpoint
+        """
+        while checkpoints[1] is not None and checkpoints[1] < current_date:
+            self.__advance_checkpoint(checkpoints)
+
+        if checkpoints[1] != current_date:
+            return None
+
+        # Consume the matched checkpoint now, so an out-of-order checkpoint after it is caught even on the last row
+        self.__advance_checkpoint(checkpoints)
+
+        return self.xirrs_utils.calculate_xirr(cash_flows + [{
+            "date": datetime.datetime.strptime(current_date, "%Y-%m-%d"),
+            "value": balance
+        }])
 
     def __get_benchmark_returns(self, benchmark_values, investment_returns, investment_transactions):
         """